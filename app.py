@@ -1,7 +1,12 @@
 # app.py
 
+import concurrent.futures
 import streamlit as st
 from universal_camera_detector.detector import UniversalCameraDetector
+from universal_camera_detector.circuit_breaker import NegativeCache
+from universal_camera_detector.inventory import EndpointInventory
+from universal_camera_detector.utils import parse_ip_file, parse_port_candidates
+from universal_camera_detector.snapshots import SnapshotEngine
 from universal_camera_detector.exporters import export_to_excel_with_images, export_to_csv_with_base64
 import pandas as pd
 import io
@@ -14,10 +19,23 @@ st.title("🎥 Detector Universal de Câmeras com Thumbnails")
 st.sidebar.header("⚙️ Configurações")
 username_input = st.sidebar.text_input("Usuários", value="admin,user,root")
 password_input = st.sidebar.text_input("Senhas", value="admin,admin123,password")
-protocol = st.sidebar.selectbox("Protocolo", ["http", "https"])
-port = st.sidebar.number_input("Porta", min_value=1, max_value=65535, value=80)
+ports_input = st.sidebar.text_input("Portas (protocolo:porta)", value="http:80,https:443,http:8000,http:8080,rtsp:554")
+inventory_path = st.sidebar.text_input("Inventário de portas", value="inventario_cameras.json")
 timeout = st.sidebar.slider("Timeout", 1, 30, 10)
 max_workers = st.sidebar.slider("Threads", 1, 20, 10)
+max_failures = st.sidebar.slider("Falhas até bloquear host", 1, 10, 3)
+dead_ttl = st.sidebar.number_input("TTL de hosts mortos (s)", min_value=0, max_value=86400, value=300)
+
+if 'negative_cache' not in st.session_state:
+    st.session_state['negative_cache'] = NegativeCache()
+negative_cache = st.session_state['negative_cache']
+negative_cache.ttl = dead_ttl
+capture_snapshots = st.sidebar.checkbox("Capturar snapshots de todos os canais", value=False)
+snapshot_dir = st.sidebar.text_input("Pasta de snapshots", value="snapshots")
+snapshot_max_kb = st.sidebar.number_input("Tamanho máximo do snapshot (KB)", min_value=64, max_value=20480, value=2048)
+
+if 'snapshot_endpoints' not in st.session_state:
+    st.session_state['snapshot_endpoints'] = {}
 
 ip_file = st.sidebar.file_uploader("Upload de IPs (.txt)", type=["txt"])
 
@@ -26,16 +44,20 @@ if ip_file:
     ip_list = parse_ip_file(content)
     if ip_list:
         st.success(f"✅ {len(ip_list)} IPs carregados")
-        if st.button("🚀 Iniciar Detecção"):
+        candidates = parse_port_candidates(ports_input)
+        if not candidates:
+            st.error("❌ Nenhuma porta válida informada (ex.: http:80,https:443).")
+        elif st.button("🚀 Iniciar Detecção"):
             username_list = [u.strip() for u in username_input.split(',') if u.strip()]
             password_list = [p.strip() for p in password_input.split(',') if p.strip()]
+            inventory = EndpointInventory(inventory_path or None)
 
-            detector = UniversalCameraDetector()
+            detector = UniversalCameraDetector(max_failures=max_failures, negative_cache=negative_cache)
             discovered = []
 
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
                 future_to_ip = {
-                    executor.submit(detector.detect_camera_brand, ip, username_list, password_list, protocol, port, timeout): ip
+                    executor.submit(detector.detect_camera_multiport, ip, username_list, password_list, candidates, timeout, inventory): ip
                     for ip in ip_list
                 }
 
@@ -44,8 +66,9 @@ if ip_file:
                     try:
                         result = future.result()
                         if result:
-                            net_info = detector.get_network_info(result, ip, protocol, port, timeout)
+                            net_info = detector.get_network_info(result, ip, result['protocol'], result['port'], timeout)
                             result.update(net_info)
+                            result["IP"] = ip
                             result["Status"] = "✅ Online"
                         else:
                             result = {
@@ -73,6 +96,23 @@ if ip_file:
                             "Status": "⚠️ Erro"
                         })
 
+            inventory.save()
+
+            if capture_snapshots:
+                online = [(cam['IP'], cam) for cam in discovered if cam.get('Status') == "✅ Online"]
+                engine = SnapshotEngine(
+                    detector, snapshot_dir, max_bytes=snapshot_max_kb * 1024,
+                    max_workers=max_workers, endpoint_memory=st.session_state['snapshot_endpoints']
+                )
+                snapshots = engine.capture_all(online, timeout)
+                for cam in discovered:
+                    channel_files = snapshots.get(cam['IP'])
+                    if channel_files:
+                        cam['Snapshots'] = len(channel_files)
+                        first_channel = channel_files[min(channel_files)]
+                        with open(first_channel, 'rb') as f:
+                            cam['Thumbnail_Bytes'] = f.read()
+
             st.session_state['discovered'] = discovered
     else:
         st.error("❌ Nenhum IP válido encontrado.")
@@ -0,0 +1,226 @@
+# benchmarks/bench_parsing.py
+"""Benchmark do parsing de respostas XML (Hikvision) e key=value (Dahua).
+
+Uso: python benchmarks/bench_parsing.py [repetições]
+"""
+
+import os
+import sys
+import timeit
+import xml.etree.ElementTree as ET
+
+# Reaproveita o bootstrap do pacote e as respostas fixas dos testes
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests'))
+from support import CannedBreaker  # noqa: E402
+
+from universal_camera_detector import parsers  # noqa: E402
+from universal_camera_detector.dahua_handler import DahuaHandler  # noqa: E402
+from universal_camera_detector.hikvision_handler import HikvisionHandler  # noqa: E402
+
+LEGACY_NAMESPACES = [
+    {'ns': 'http://www.hikvision.com/ver20/XMLSchema'},
+    {'ns': 'http://www.hikvision.com/ver10/XMLSchema'},
+    {'ns': 'http://www.isapi.org/ver20/XMLSchema'}
+]
+
+DEVICE_INFO_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<DeviceInfo version="2.0" xmlns="http://www.isapi.org/ver20/XMLSchema">
+    <deviceName>IP CAMERA</deviceName>
+    <deviceID>88</deviceID>
+    <deviceDescription>IPCamera</deviceDescription>
+    <deviceLocation>hangzhou</deviceLocation>
+    <systemContact>Hikvision.China</systemContact>
+    <model>DS-2CD2143G0-I</model>
+    <serialNumber>DS-2CD2143G0-I20190101AAWRC12345678</serialNumber>
+    <macAddress>44:19:b6:00:00:01</macAddress>
+    <firmwareVersion>V5.5.82</firmwareVersion>
+    <firmwareReleasedDate>build 190909</firmwareReleasedDate>
+    <encoderVersion>V7.3</encoderVersion>
+    <encoderReleasedDate>build 190909</encoderReleasedDate>
+    <deviceType>IPCamera</deviceType>
+    <telecontrolID>88</telecontrolID>
+</DeviceInfo>"""
+
+NETWORK_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<IPAddress version="2.0" xmlns="http://www.hikvision.com/ver20/XMLSchema">
+    <ipVersion>dual</ipVersion>
+    <addressingType>static</addressingType>
+    <ipAddress>192.168.1.64</ipAddress>
+    <subnetMask>255.255.255.0</subnetMask>
+    <ipv6Address>::</ipv6Address>
+    <bitMask>0</bitMask>
+    <DefaultGateway>
+        <ipAddress>192.168.1.1</ipAddress>
+        <ipv6Address>::</ipv6Address>
+    </DefaultGateway>
+    <PrimaryDNS><ipAddress>8.8.8.8</ipAddress></PrimaryDNS>
+    <SecondaryDNS><ipAddress>8.8.4.4</ipAddress></SecondaryDNS>
+</IPAddress>"""
+
+DAHUA_NETWORK_TEXT = "\r\n".join(
+    ["table.Network.DefaultInterface=eth0", "table.Network.Domain=dahua", "table.Network.Hostname=IPC"]
+    + [f"table.Network.eth0.{key}={value}" for key, value in [
+        ('DefaultGateway', '192.168.1.1'), ('DhcpEnable', 'false'), ('IPAddress', '192.168.1.108'),
+        ('MTU', '1500'), ('PhysicalAddress', '3c:ef:8c:00:00:01'), ('SubnetMask', '255.255.255.0')
+    ]]
+    + [f"table.Network.eth0.DnsServers[{i}]=8.8.{i}.{i}" for i in range(2)]
+    + [f"table.Network.eth1.Option{i}=value{i}" for i in range(120)]
+) + "\r\n"
+
+
+def legacy_parse_dahua_response(response_text: str):
+    """DahuaHandler._parse_dahua_response original"""
+    info = {}
+    for line in response_text.strip().split('\n'):
+        if '=' in line:
+            key, value = line.split('=', 1)
+            info[key.strip()] = value.strip()
+    return info
+
+
+class LegacyHikvisionHandler(HikvisionHandler):
+    """Caminho original: ElementTree + busca './/tag' em cada namespace.
+
+    Os caminhos sem prefixo nunca casavam com documentos ISAPI com namespace,
+    então o original devolvia 'Modelo Desconhecido' e o IP do próprio host.
+    """
+
+    def detect_camera(self, ip, username, password, protocol, port, timeout):
+        response = self.circuit_breaker.request('get', ip, f"{protocol}://{ip}:{port}/ISAPI/System/deviceInfo")
+        xml = ET.fromstring(response.content)
+        for namespace in LEGACY_NAMESPACES:
+            model_elem = xml.find('.//model', namespaces=namespace)
+            serial_elem = xml.find('.//serialNumber', namespaces=namespace)
+            if model_elem is not None:
+                return True, {'brand': 'Hikvision', 'model': model_elem.text, 'serial': serial_elem.text}
+        return True, {'brand': 'Hikvision', 'model': 'Modelo Desconhecido', 'serial': 'Desconhecido'}
+
+    def get_network_info(self, ip, username, password, auth_info, protocol, port, timeout):
+        response = self.circuit_breaker.request('get', ip, f"{protocol}://{ip}:{port}/ISAPI/System/Network/interfaces/1/ipAddress")
+        xml = ET.fromstring(response.content)
+        namespace = auth_info.get('namespace', LEGACY_NAMESPACES[0])
+        ip_atual = xml.find('.//ipAddress', namespaces=namespace)
+        mascara = xml.find('.//subnetMask', namespaces=namespace)
+        gateway_elem = xml.find('.//DefaultGateway/ipAddress', namespaces=namespace)
+        return {
+            'ip_atual': ip_atual.text if ip_atual is not None else ip,
+            'mascara': mascara.text if mascara is not None else '—',
+            'gateway': gateway_elem.text if gateway_elem is not None else '—',
+            'dhcp': '—'
+        }
+
+
+class LegacyDahuaHandler(DahuaHandler):
+    """Caminho original: todos os ENDPOINTS e parse completo de cada resposta"""
+
+    def _collect_dahua_info(self, ip, username, password, auth_type, protocol, port, timeout):
+        info = {}
+        for key, endpoint in self.ENDPOINTS.items():
+            response = self.circuit_breaker.request('get', ip, f"{protocol}://{ip}:{port}{endpoint}")
+            if response.status_code == 200:
+                parsed_info = legacy_parse_dahua_response(response.text)
+                if key == 'device_info':
+                    info.update({
+                        'model': parsed_info.get('DeviceType', 'Desconhecido'),
+                        'serial': parsed_info.get('sn', 'Desconhecido'),
+                        'version': parsed_info.get('SoftwareVersion', 'Desconhecido')
+                    })
+        return info
+
+    def get_network_info(self, ip, username, password, auth_info, protocol, port, timeout):
+        response = self.circuit_breaker.request('get', ip, f"{protocol}://{ip}:{port}{self.ENDPOINTS['network_info']}")
+        config = legacy_parse_dahua_response(response.text)
+        return {
+            'ip_atual': config.get('table.Network.eth0.IPAddress', ip),
+            'mascara': config.get('table.Network.eth0.SubnetMask', '—'),
+            'gateway': config.get('table.Network.eth0.DefaultGateway', '—'),
+            'dhcp': config.get('table.Network.eth0.DhcpEnable', '—')
+        }
+
+
+def legacy_hikvision_device_info(content: bytes):
+    """Trecho de parse do HikvisionHandler.detect_camera original"""
+    xml = ET.fromstring(content)
+    for namespace in LEGACY_NAMESPACES:
+        model = xml.find('.//model', namespaces=namespace)
+        serial = xml.find('.//serialNumber', namespaces=namespace)
+        if model is not None:
+            return model.text, serial.text
+    return None, None
+
+
+def new_hikvision_device_info(content: bytes):
+    selectors = HikvisionHandler.SELECTORS
+    xml = parsers.parse_xml(content)
+    uri = parsers.namespace_of(xml)
+    return selectors['model'].select(xml, uri), selectors['serial'].select(xml, uri)
+
+
+def legacy_dahua_network(text: str):
+    info = legacy_parse_dahua_response(text)
+    return {key: info[key] for key in DahuaHandler.NETWORK_KEYS if key in info}
+
+
+def new_dahua_network(text: str):
+    return parsers.scan_kv(text, DahuaHandler.NETWORK_KEYS)
+
+
+def run(label: str, func, number: int, baseline: float = None) -> float:
+    elapsed = timeit.timeit(func, number=number)
+    per_call = elapsed / number * 1e6
+    speedup = f"  ({baseline / elapsed:.1f}x)" if baseline else ""
+    print(f"{label:<48} {per_call:8.2f} µs/chamada{speedup}")
+    return elapsed
+
+
+def compare(label: str, legacy, new, number: int):
+    base = run(f"{label} (legado)", legacy, number)
+    run(f"{label} (atual)", new, number, base)
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"Backend XML: {'lxml' if parsers.HAS_LXML else 'ElementTree'}  |  {number} repetições\n")
+
+    assert legacy_dahua_network(DAHUA_NETWORK_TEXT) == new_dahua_network(DAHUA_NETWORK_TEXT)
+    print(f"deviceInfo legado: {legacy_hikvision_device_info(DEVICE_INFO_XML)}  |  atual: {new_hikvision_device_info(DEVICE_INFO_XML)}\n")
+
+    compare("Parse Hikvision deviceInfo", lambda: legacy_hikvision_device_info(DEVICE_INFO_XML),
+            lambda: new_hikvision_device_info(DEVICE_INFO_XML), number)
+    compare("Parse Dahua Network key=value", lambda: legacy_dahua_network(DAHUA_NETWORK_TEXT),
+            lambda: new_dahua_network(DAHUA_NETWORK_TEXT), number)
+    print()
+
+    hikvision_responses = {
+        '/ISAPI/System/deviceInfo': DEVICE_INFO_XML,
+        '/ISAPI/System/Network/interfaces/1/ipAddress': NETWORK_XML
+    }
+    dahua_responses = {
+        DahuaHandler.ENDPOINTS['device_info']: b"DeviceType=DH-IPC-HFW1230S\r\nsn=4E0123PAZ\r\nSoftwareVersion=2.800\r\n",
+        DahuaHandler.ENDPOINTS['network_info']: DAHUA_NETWORK_TEXT.encode('utf-8')
+    }
+    legacy_hikvision, hikvision = (cls(CannedBreaker(hikvision_responses)) for cls in (LegacyHikvisionHandler, HikvisionHandler))
+    legacy_dahua, dahua = (cls(CannedBreaker(dahua_responses)) for cls in (LegacyDahuaHandler, DahuaHandler))
+    dahua_auth = {'auth_type': 'basic'}
+
+    compare("HikvisionHandler.detect_camera",
+            lambda: legacy_hikvision.detect_camera('10.0.0.1', 'admin', 'x', 'http', 80, 1),
+            lambda: hikvision.detect_camera('10.0.0.1', 'admin', 'x', 'http', 80, 1), number)
+    compare("HikvisionHandler.get_network_info",
+            lambda: legacy_hikvision.get_network_info('10.0.0.1', 'admin', 'x', {}, 'http', 80, 1),
+            lambda: hikvision.get_network_info('10.0.0.1', 'admin', 'x', {}, 'http', 80, 1), number)
+    compare("DahuaHandler.get_network_info",
+            lambda: legacy_dahua.get_network_info('10.0.0.1', 'admin', 'x', dahua_auth, 'http', 80, 1),
+            lambda: dahua.get_network_info('10.0.0.1', 'admin', 'x', dahua_auth, 'http', 80, 1), number)
+
+    for handler in (legacy_dahua, dahua):
+        handler.circuit_breaker.urls.clear()
+    compare("DahuaHandler._collect_dahua_info",
+            lambda: legacy_dahua._collect_dahua_info('10.0.0.1', 'admin', 'x', 'basic', 'http', 80, 1),
+            lambda: dahua._collect_dahua_info('10.0.0.1', 'admin', 'x', 'basic', 'http', 80, 1), number)
+    print(f"  requisições HTTP por chamada: legado {len(legacy_dahua.circuit_breaker.urls) // number}, "
+          f"atual {len(dahua.circuit_breaker.urls) // number}")
+
+
+if __name__ == '__main__':
+    main()
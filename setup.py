@@ -16,11 +16,13 @@ setup(
         "streamlit",
         "requests",
         "pandas",
-        "lxml",
         "Pillow",
         "openpyxl",
         "concurrent.futures"
     ],
+    extras_require={
+        "lxml": ["lxml"]
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,5 @@
+# tests/conftest.py
+
+from support import register_package
+
+register_package()
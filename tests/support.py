@@ -0,0 +1,63 @@
+# tests/support.py
+"""Utilitários compartilhados pelos testes e pelos benchmarks"""
+
+import importlib.util
+import os
+import sys
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'universal-camera-detector')
+
+
+def register_package():
+    """O diretório do pacote tem hífen no nome; registra-o como universal_camera_detector"""
+    if 'universal_camera_detector' in sys.modules:
+        return
+    spec = importlib.util.spec_from_file_location(
+        'universal_camera_detector', os.path.join(PACKAGE_DIR, '__init__.py'),
+        submodule_search_locations=[PACKAGE_DIR]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['universal_camera_detector'] = module
+    spec.loader.exec_module(module)
+
+
+register_package()
+
+from universal_camera_detector.circuit_breaker import HostCircuitBreaker  # noqa: E402
+
+
+class CannedResponse:
+    """Resposta HTTP fixa, com suporte a leitura em blocos (stream=True)"""
+
+    def __init__(self, body: bytes, status_code: int = 200, headers=None):
+        self.status_code = status_code
+        self.content = body
+        self.text = body.decode('utf-8', errors='replace')
+        self.headers = headers or {}
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class CannedBreaker(HostCircuitBreaker):
+    """Devolve respostas fixas por sufixo de URL, sem acesso à rede, e registra as URLs pedidas.
+
+    Os valores podem ser bytes (resposta 200) ou uma CannedResponse pronta.
+    """
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = responses
+        self.urls = []
+
+    def request(self, method, ip, url, **kwargs):
+        self.urls.append(url)
+        for suffix, body in self.responses.items():
+            if url.endswith(suffix):
+                return body if isinstance(body, CannedResponse) else CannedResponse(body)
+        return CannedResponse(b'Error', 404)
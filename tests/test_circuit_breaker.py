@@ -0,0 +1,208 @@
+# tests/test_circuit_breaker.py
+
+import time
+
+import pytest
+import requests
+
+from universal_camera_detector.circuit_breaker import HostCircuitBreaker, HostUnavailableError, NegativeCache
+
+IP = '10.0.0.1'
+
+
+class FakeResponse:
+    status_code = 200
+
+
+@pytest.fixture
+def fake_request(monkeypatch):
+    """Substitui requests.request por uma fila de resultados (resposta ou exceção)"""
+    outcomes = []
+    calls = []
+
+    def request(method, url, **kwargs):
+        calls.append(url)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(requests, 'request', request)
+    return outcomes, calls
+
+
+def test_breaker_opens_after_max_failures(fake_request):
+    outcomes, calls = fake_request
+    outcomes.extend([requests.exceptions.ConnectTimeout()] * 2)
+    cache = NegativeCache()
+    breaker = HostCircuitBreaker(max_failures=2, negative_cache=cache)
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectTimeout):
+            breaker.request('get', IP, 'http://10.0.0.1/')
+
+    assert breaker.is_open(IP)
+    assert cache.is_dead(IP)
+    with pytest.raises(HostUnavailableError):
+        breaker.request('get', IP, 'http://10.0.0.1/')
+    assert len(calls) == 2
+
+
+def test_success_resets_failure_count(fake_request):
+    outcomes, _ = fake_request
+    outcomes.extend([requests.exceptions.ConnectionError(), FakeResponse(), requests.exceptions.ConnectionError()])
+    breaker = HostCircuitBreaker(max_failures=2)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        breaker.request('get', IP, 'http://10.0.0.1/')
+    breaker.request('get', IP, 'http://10.0.0.1/')
+    with pytest.raises(requests.exceptions.ConnectionError):
+        breaker.request('get', IP, 'http://10.0.0.1/')
+
+    assert not breaker.is_open(IP)
+
+
+def test_read_timeouts_on_alive_host_are_bounded_but_not_cached(fake_request):
+    outcomes, calls = fake_request
+    outcomes.append(FakeResponse())
+    outcomes.extend([requests.exceptions.ReadTimeout()] * 50)
+    cache = NegativeCache()
+    breaker = HostCircuitBreaker(max_failures=2, negative_cache=cache, max_read_timeouts=4)
+
+    breaker.request('get', IP, 'http://10.0.0.1/ISAPI/System/deviceInfo')
+    for _ in range(50):
+        try:
+            breaker.request('get', IP, 'http://10.0.0.1/ISAPI/Streaming/channels/101/picture')
+        except HostUnavailableError:
+            break
+        except requests.exceptions.ReadTimeout:
+            continue
+
+    assert len(calls) == 1 + 4
+    assert breaker.is_open(IP)
+    assert not cache.is_dead(IP)
+
+
+def test_read_timeouts_before_any_response_count_as_failures(fake_request):
+    outcomes, calls = fake_request
+    outcomes.extend([requests.exceptions.ReadTimeout()] * 10)
+    cache = NegativeCache()
+    breaker = HostCircuitBreaker(max_failures=3, negative_cache=cache)
+
+    for _ in range(10):
+        try:
+            breaker.request('get', IP, 'http://10.0.0.1/')
+        except HostUnavailableError:
+            break
+        except requests.exceptions.ReadTimeout:
+            continue
+
+    assert len(calls) == 3
+    assert cache.is_dead(IP)
+
+
+def test_connect_failures_after_success_open_circuit_without_caching(fake_request):
+    outcomes, _ = fake_request
+    outcomes.append(FakeResponse())
+    outcomes.extend([requests.exceptions.ConnectTimeout()] * 2)
+    cache = NegativeCache()
+    breaker = HostCircuitBreaker(max_failures=2, negative_cache=cache)
+
+    breaker.request('get', IP, 'http://10.0.0.1/')
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectTimeout):
+            breaker.request('get', IP, 'http://10.0.0.1/')
+    breaker.trip(IP)
+
+    assert breaker.is_open(IP)
+    assert not cache.is_dead(IP)
+
+
+def test_negative_cache_ttl():
+    cache = NegativeCache(ttl=0.05)
+    cache.add(IP)
+    assert cache.is_dead(IP) and not cache.is_expired(IP)
+
+    time.sleep(0.06)
+    assert not cache.is_dead(IP) and cache.is_expired(IP)
+
+    cache.remove(IP)
+    assert not cache.is_dead(IP) and not cache.is_expired(IP)
+
+
+def test_admit_skips_dead_host_without_probing():
+    cache = NegativeCache(ttl=60)
+    cache.add(IP)
+    breaker = HostCircuitBreaker(negative_cache=cache)
+    probes = []
+
+    assert not breaker.admit(IP, lambda: probes.append(IP) or True)
+    assert probes == []
+
+
+def test_admit_half_open_probe_after_ttl():
+    cache = NegativeCache(ttl=0.01)
+    breaker = HostCircuitBreaker(negative_cache=cache)
+
+    cache.add(IP)
+    time.sleep(0.02)
+    assert not breaker.admit(IP, lambda: False)
+    assert cache.is_dead(IP)
+
+    cache.ttl = 0.01
+    cache.add(IP)
+    time.sleep(0.02)
+    assert breaker.admit(IP, lambda: True)
+    assert len(cache) == 0
+
+
+def test_multiport_uses_port_probe_as_half_open_probe(monkeypatch):
+    from universal_camera_detector.detector import UniversalCameraDetector
+
+    cache = NegativeCache(ttl=0.01)
+    detector = UniversalCameraDetector(negative_cache=cache)
+    probes = []
+
+    def probe_ports(ip, candidates, timeout):
+        probes.append(ip)
+        return []
+
+    monkeypatch.setattr(detector, 'probe_ports', probe_ports)
+
+    cache.add(IP)
+    assert detector.detect_camera_multiport(IP, ['admin'], ['admin'], [('http', 80)], 1) is None
+    assert probes == []
+
+    time.sleep(0.02)
+    assert detector.detect_camera_multiport(IP, ['admin'], ['admin'], [('http', 80)], 1) is None
+    assert probes == [IP]
+    assert cache.is_dead(IP)
+
+
+def test_multiport_silent_open_port_is_bounded(fake_request, monkeypatch):
+    from universal_camera_detector.detector import UniversalCameraDetector
+
+    outcomes, calls = fake_request
+    outcomes.extend([requests.exceptions.ReadTimeout()] * 200)
+    cache = NegativeCache()
+    detector = UniversalCameraDetector(negative_cache=cache)
+    monkeypatch.setattr(detector, 'probe_ports', lambda ip, candidates, timeout: [('http', 8000)])
+
+    assert detector.detect_camera_multiport(IP, ['a', 'b', 'c'], ['x', 'y', 'z'], [('http', 8000)], 1) is None
+    assert len(calls) == detector.circuit_breaker.max_failures
+    assert not detector.circuit_breaker.is_alive(IP)
+    assert cache.is_dead(IP)
+
+
+def test_ssl_errors_do_not_count_against_host(fake_request):
+    outcomes, _ = fake_request
+    outcomes.extend([requests.exceptions.SSLError()] * 5)
+    cache = NegativeCache()
+    breaker = HostCircuitBreaker(max_failures=2, negative_cache=cache)
+
+    for _ in range(5):
+        with pytest.raises(requests.exceptions.SSLError):
+            breaker.request('get', IP, 'https://10.0.0.1:8080/')
+
+    assert not breaker.is_open(IP)
+    assert not cache.is_dead(IP)
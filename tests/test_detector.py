@@ -0,0 +1,137 @@
+# tests/test_detector.py
+
+import pytest
+import requests
+
+from universal_camera_detector.circuit_breaker import NegativeCache
+from universal_camera_detector.detector import UniversalCameraDetector
+from universal_camera_detector.inventory import EndpointInventory
+from universal_camera_detector.utils import parse_port_candidates
+
+IP = '127.0.0.1'
+
+DEVICE_INFO_XML = (b'<DeviceInfo xmlns="http://www.isapi.org/ver20/XMLSchema">'
+                   b'<model>DS-7608NI</model><serialNumber>S123</serialNumber></DeviceInfo>')
+
+
+class FakeResponse:
+    def __init__(self, body: bytes = b'', status_code: int = 200):
+        self.status_code = status_code
+        self.content = body
+        self.text = body.decode('utf-8')
+        self.headers = {}
+
+
+@pytest.fixture
+def camera(monkeypatch):
+    """Câmera Hikvision falsa em `http_ports`; `web_ports` respondem 404 para tudo"""
+    state = {'http_ports': set(), 'web_ports': set(), 'urls': []}
+
+    def request(method, url, **kwargs):
+        state['urls'].append(url)
+        scheme, rest = url.split('://', 1)
+        port = int(rest.split('/', 1)[0].rsplit(':', 1)[1])
+        if port in state['web_ports']:
+            return FakeResponse(b'Not Found', 404)
+        if port not in state['http_ports']:
+            raise requests.exceptions.ConnectTimeout()
+        if scheme == 'https':
+            raise requests.exceptions.SSLError('wrong version number')
+        if url.endswith('/ISAPI/System/deviceInfo'):
+            return FakeResponse(DEVICE_INFO_XML)
+        return FakeResponse(b'Not Found', 404)
+
+    monkeypatch.setattr(requests, 'request', request)
+    return state
+
+
+def test_parse_port_candidates():
+    assert parse_port_candidates("http:80, 443,8000,rtsp:554,http:80") == [
+        ('http', 80), ('https', 443), ('http', 8000), ('rtsp', 554)
+    ]
+    assert parse_port_candidates("htp80, 8o80") == []
+
+
+def test_multiport_with_no_candidates_does_not_trip():
+    cache = NegativeCache()
+    detector = UniversalCameraDetector(negative_cache=cache)
+
+    assert detector.detect_camera_multiport(IP, ['admin'], ['admin'], parse_port_candidates("htp80, 8o80"), 1) is None
+    assert not detector.circuit_breaker.is_open(IP)
+    assert not cache.is_dead(IP)
+
+
+def test_multiport_tls_failure_does_not_block_plain_http(camera, monkeypatch):
+    camera['http_ports'].add(8080)
+    detector = UniversalCameraDetector()
+    candidates = [('https', 8080), ('http', 8080)]
+    monkeypatch.setattr(detector, 'probe_ports', lambda ip, candidates, timeout: list(candidates))
+
+    info = detector.detect_camera_multiport(IP, ['admin'], ['admin'], candidates, 1)
+
+    assert info['protocol'] == 'http' and info['port'] == 8080
+    assert not detector.circuit_breaker.is_open(IP)
+
+
+def all_open(detector, monkeypatch):
+    """Faz probe_ports considerar todas as candidatas abertas e registra a ordem recebida"""
+    probed = []
+
+    def probe_ports(ip, candidates, timeout):
+        probed.append(list(candidates))
+        return list(candidates)
+
+    monkeypatch.setattr(detector, 'probe_ports', probe_ports)
+    return probed
+
+
+def test_multiport_picks_working_endpoint_and_fills_result(camera, monkeypatch):
+    camera['web_ports'].add(80)
+    camera['http_ports'].add(8000)
+    detector = UniversalCameraDetector()
+    all_open(detector, monkeypatch)
+    candidates = [('http', 80), ('rtsp', 554), ('http', 8000)]
+
+    info = detector.detect_camera_multiport(IP, ['admin'], ['12345'], candidates, 1)
+
+    assert info['brand'] == 'Hikvision' and info['model'] == 'DS-7608NI'
+    assert (info['protocol'], info['port']) == ('http', 8000)
+    assert info['open_ports'] == ['http:80', 'rtsp:554', 'http:8000']
+    assert info['username'] == 'admin' and info['password'] == '12345'
+
+
+def test_multiport_skips_non_http_ports(camera, monkeypatch):
+    camera['http_ports'].add(80)
+    detector = UniversalCameraDetector()
+    all_open(detector, monkeypatch)
+
+    info = detector.detect_camera_multiport(IP, ['admin'], ['admin'], [('rtsp', 554), ('http', 80)], 1)
+
+    assert info['port'] == 80
+    assert not any(':554' in url for url in camera['urls'])
+
+
+def test_inventory_round_trip_puts_remembered_endpoint_first(camera, monkeypatch, tmp_path):
+    camera['web_ports'].add(80)
+    camera['http_ports'].add(8080)
+    path = str(tmp_path / 'inventario.json')
+    candidates = [('http', 80), ('http', 8080)]
+
+    inventory = EndpointInventory(path)
+    detector = UniversalCameraDetector()
+    all_open(detector, monkeypatch)
+    detector.detect_camera_multiport(IP, ['admin'], ['admin'], candidates, 1, inventory)
+    inventory.save()
+
+    reloaded = EndpointInventory(path)
+    assert reloaded.get(IP) == ('http', 8080)
+    assert len(reloaded) == 1
+
+    detector = UniversalCameraDetector()
+    probed = all_open(detector, monkeypatch)
+    camera['urls'].clear()
+    info = detector.detect_camera_multiport(IP, ['admin'], ['admin'], candidates, 1, reloaded)
+
+    assert probed == [[('http', 8080), ('http', 80)]]
+    assert info['port'] == 8080
+    assert not any(':80/' in url for url in camera['urls'])
@@ -0,0 +1,73 @@
+# tests/test_handlers.py
+
+from universal_camera_detector.dahua_handler import DahuaHandler
+from universal_camera_detector.hikvision_handler import HikvisionHandler
+
+from support import CannedBreaker
+
+IP = '10.0.0.1'
+
+
+def video_inputs(ids):
+    channels = ''.join(f"<VideoInputChannel><id>{i}</id></VideoInputChannel>" for i in ids)
+    return f'<VideoInputChannelList xmlns="http://www.hikvision.com/ver20/XMLSchema">{channels}</VideoInputChannelList>'.encode()
+
+
+def input_proxies(ids):
+    channels = ''.join(f"<InputProxyChannel><id>{i}</id></InputProxyChannel>" for i in ids)
+    return f'<InputProxyChannelList xmlns="http://www.hikvision.com/ver20/XMLSchema">{channels}</InputProxyChannelList>'.encode()
+
+
+def hikvision_channels(responses):
+    handler = HikvisionHandler(CannedBreaker(responses))
+    return handler.get_channels(IP, 'admin', 'x', {}, 'http', 80, 1)
+
+
+def dahua_channels(responses):
+    handler = DahuaHandler(CannedBreaker(responses))
+    return handler.get_channels(IP, 'admin', 'x', {'auth_type': 'digest'}, 'http', 80, 1)
+
+
+def test_hikvision_camera_without_channel_lists():
+    assert hikvision_channels({}) == [1]
+
+
+def test_hikvision_nvr_uses_proxy_channel_ids():
+    assert hikvision_channels({'/ISAPI/ContentMgmt/InputProxy/channels': input_proxies([1, 2, 5])}) == [1, 2, 5]
+
+
+def test_hikvision_hybrid_dvr_includes_analog_and_ip_channels():
+    assert hikvision_channels({
+        '/ISAPI/System/Video/inputs/channels': video_inputs([1, 2, 3, 4]),
+        '/ISAPI/ContentMgmt/InputProxy/channels': input_proxies([1, 2])
+    }) == [1, 2, 3, 4, 5, 6]
+    assert hikvision_channels({
+        '/ISAPI/System/Video/inputs/channels': video_inputs([1, 2]),
+        '/ISAPI/ContentMgmt/InputProxy/channels': input_proxies([33, 34])
+    }) == [1, 2, 33, 34]
+
+
+def test_dahua_xvr_adds_analog_and_remote_channels():
+    assert dahua_channels({
+        'action=getCollect': b"result=8\r\n",
+        'name=MaxRemoteInputChannels': b"table.MaxRemoteInputChannels=4\r\n"
+    }) == list(range(1, 13))
+
+
+def test_dahua_camera_and_nvr():
+    assert dahua_channels({'action=getCollect': b"result=1\r\n"}) == [1]
+    assert dahua_channels({
+        'action=getCollect': b"result=0\r\n",
+        'name=MaxRemoteInputChannels': b"table.MaxRemoteInputChannels=16\r\n"
+    }) == list(range(1, 17))
+    assert dahua_channels({}) == [1]
+
+
+def test_dahua_collect_info_requests_only_device_info():
+    breaker = CannedBreaker({
+        DahuaHandler.ENDPOINTS['device_info']: b"DeviceType=DH-IPC-HFW1230S\r\nsn=4E0123PAZ\r\nSoftwareVersion=2.800\r\n"
+    })
+    info = DahuaHandler(breaker)._collect_dahua_info(IP, 'admin', 'x', 'digest', 'http', 80, 1)
+
+    assert info == {'model': 'DH-IPC-HFW1230S', 'serial': '4E0123PAZ', 'version': '2.800'}
+    assert breaker.urls == [f"http://{IP}:80{DahuaHandler.ENDPOINTS['device_info']}"]
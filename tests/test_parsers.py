@@ -0,0 +1,73 @@
+# tests/test_parsers.py
+
+import pytest
+
+from universal_camera_detector import parsers
+from universal_camera_detector.parsers import XmlSelector, namespace_of, parse_xml, scan_kv
+
+NETWORK_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<IPAddress version="2.0" xmlns="http://www.hikvision.com/ver20/XMLSchema">
+    <ipAddress>192.168.1.64</ipAddress>
+    <subnetMask>255.255.255.0</subnetMask>
+    <DefaultGateway>
+        <ipAddress>192.168.1.1</ipAddress>
+    </DefaultGateway>
+    <PrimaryDNS><ipAddress>8.8.8.8</ipAddress></PrimaryDNS>
+</IPAddress>"""
+
+CHANNELS_XML = b"""<InputProxyChannelList xmlns="http://www.isapi.org/ver20/XMLSchema">
+    <InputProxyChannel><id>1</id><sourceInputPortDescriptor><id>9</id></sourceInputPortDescriptor></InputProxyChannel>
+    <InputProxyChannel><id>2</id></InputProxyChannel>
+</InputProxyChannelList>"""
+
+BACKENDS = ['ElementTree'] + (['lxml'] if parsers.lxml_etree is not None else [])
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    monkeypatch.setattr(parsers, 'HAS_LXML', request.param == 'lxml')
+    return request.param
+
+
+def test_parse_xml_uses_selected_backend(backend):
+    root = parse_xml(NETWORK_XML)
+    assert namespace_of(root) == 'http://www.hikvision.com/ver20/XMLSchema'
+    assert type(root).__module__.startswith('lxml') == (backend == 'lxml')
+
+
+def test_selector_select_namespaced(backend):
+    root = parse_xml(NETWORK_XML)
+    assert XmlSelector('.//ipAddress').select(root) == '192.168.1.64'
+    assert XmlSelector('.//DefaultGateway/ipAddress').select(root) == '192.168.1.1'
+    assert XmlSelector('.//model').select(root) is None
+
+
+def test_selector_unknown_and_missing_namespace(backend):
+    assert XmlSelector('.//model').select(parse_xml(b'<a xmlns="urn:other"><model>X</model></a>')) == 'X'
+    assert XmlSelector('.//model').select(parse_xml(b'<a><b><model>Y</model></b></a>')) == 'Y'
+
+
+def test_selector_count_follows_path(backend):
+    root = parse_xml(CHANNELS_XML)
+    assert XmlSelector('./InputProxyChannel').count(root) == 2
+    assert XmlSelector('./InputProxyChannel/id').count(root) == 2
+    assert XmlSelector('./InputProxyChannel/id').select_all(root) == ['1', '2']
+    assert XmlSelector('.//id').count(root) == 3
+
+
+def test_scan_kv_selects_requested_keys():
+    text = "a=1\r\n b = 2 \r\nnoise\r\nc=x=y\r\nb=3"
+    assert scan_kv(text, ['b', 'c', 'missing']) == {'b': '2', 'c': 'x=y'}
+
+
+def test_scan_kv_stops_once_keys_are_found():
+    class CountingStr(str):
+        finds = 0
+
+        def find(self, *args):
+            CountingStr.finds += 1
+            return super().find(*args)
+
+    lines = ["wanted=1"] + [f"other{i}=v" for i in range(100)]
+    assert scan_kv(CountingStr("\n".join(lines)), ['wanted']) == {'wanted': '1'}
+    assert CountingStr.finds == 2
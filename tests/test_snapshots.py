@@ -0,0 +1,71 @@
+# tests/test_snapshots.py
+
+import io
+
+from universal_camera_detector.detector import UniversalCameraDetector
+from universal_camera_detector.hikvision_handler import HikvisionHandler
+from universal_camera_detector.snapshots import SnapshotEngine, stream_image
+
+from support import CannedBreaker, CannedResponse
+
+IP = '10.0.0.1'
+CAMERA = {'brand': 'Hikvision', 'model': 'DS-7604NI', 'username': 'admin', 'password': 'x', 'protocol': 'http', 'port': 80}
+
+
+def jpeg(size: int, headers=None) -> CannedResponse:
+    return CannedResponse(b'\xff' * size, headers=headers or {'content-type': 'image/jpeg'})
+
+
+def engine_for(responses, tmp_path, endpoint_memory=None):
+    """SnapshotEngine com o HikvisionHandler real sobre respostas fixas"""
+    breaker = CannedBreaker(responses)
+    detector = UniversalCameraDetector()
+    detector.handlers['hikvision'] = HikvisionHandler(breaker)
+    engine = SnapshotEngine(detector, str(tmp_path), max_bytes=1024, endpoint_memory=endpoint_memory)
+    return engine, breaker
+
+
+def test_stream_image_rejects_content_length_over_cap():
+    response = jpeg(10, {'content-type': 'image/jpeg', 'content-length': '5000'})
+    buffer = io.BytesIO()
+
+    assert not stream_image(response, buffer, max_bytes=1024)
+    assert buffer.getvalue() == b''
+    assert response.closed
+
+
+def test_chunked_body_over_cap_is_aborted_without_leftover_files(tmp_path):
+    engine, _ = engine_for({'/picture': jpeg(4096)}, tmp_path)
+
+    assert engine.capture_channel(CAMERA, IP, 1, 1) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_remembered_endpoint_is_tried_first_for_same_model(tmp_path):
+    memory = {}
+    engine, breaker = engine_for({'/cgi-bin/snapshot.cgi?channel=1': jpeg(100)}, tmp_path, memory)
+
+    assert engine.capture_channel(CAMERA, IP, 1, 1)
+    assert len(breaker.urls) == 3
+    assert memory == {('Hikvision', 'DS-7604NI'): '/cgi-bin/snapshot.cgi?channel={channel}'}
+
+    breaker.urls.clear()
+    assert engine.capture_channel(CAMERA, '10.0.0.2', 1, 1)
+    assert breaker.urls == ['http://10.0.0.2:80/cgi-bin/snapshot.cgi?channel=1']
+
+
+def test_capture_device_saves_one_file_per_channel(tmp_path):
+    engine, _ = engine_for({
+        '/ISAPI/System/Video/inputs/channels': (
+            b'<VideoInputChannelList xmlns="http://www.hikvision.com/ver20/XMLSchema">'
+            + b''.join(b"<VideoInputChannel><id>%d</id></VideoInputChannel>" % i for i in (1, 2, 3))
+            + b'</VideoInputChannelList>'
+        ),
+        '/picture': jpeg(100)
+    }, tmp_path)
+
+    snapshots = engine.capture_device(CAMERA, IP, 1)
+
+    assert sorted(snapshots) == [1, 2, 3]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"{IP}_ch{i}.jpg" for i in (1, 2, 3)]
+    assert all((tmp_path / f"{IP}_ch{i}.jpg").read_bytes() == b'\xff' * 100 for i in (1, 2, 3))
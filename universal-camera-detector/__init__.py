@@ -1,4 +1,5 @@
 # universal_camera_detector/__init__.py
 
 from .detector import UniversalCameraDetector
+from .snapshots import SnapshotEngine
 from .exporters import export_to_excel_with_images, export_to_csv_with_base64
@@ -0,0 +1,162 @@
+# universal_camera_detector/circuit_breaker.py
+
+import socket
+import threading
+import time
+import logging
+from typing import Callable, Dict, Optional, Set
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class HostUnavailableError(requests.exceptions.ConnectionError):
+    """Host marcado como indisponível pelo circuit breaker"""
+
+
+class NegativeCache:
+    """Cache de hosts mortos com TTL, compartilhado entre varreduras"""
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, ip: str):
+        with self._lock:
+            self._expires[ip] = time.monotonic() + self.ttl
+
+    def remove(self, ip: str):
+        with self._lock:
+            self._expires.pop(ip, None)
+
+    def is_dead(self, ip: str) -> bool:
+        """Retorna True enquanto o host estiver dentro do TTL"""
+        with self._lock:
+            expires = self._expires.get(ip)
+        return expires is not None and time.monotonic() < expires
+
+    def is_expired(self, ip: str) -> bool:
+        """Retorna True se o host está no cache mas o TTL venceu (half-open)"""
+        with self._lock:
+            expires = self._expires.get(ip)
+        return expires is not None and time.monotonic() >= expires
+
+    def clear(self):
+        with self._lock:
+            self._expires.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._expires)
+
+
+class HostCircuitBreaker:
+    """Circuit breaker por host: limita as tentativas em hosts que não respondem.
+
+    Até o host devolver uma resposta HTTP, toda falha de conexão ou timeout
+    conta para max_failures e, ao abrir, o host vai para o cache negativo.
+    Depois da primeira resposta, timeouts de leitura (ex.: snapshot lento)
+    consomem um orçamento próprio, max_read_timeouts, e o circuito abre só
+    para esta varredura: host vivo nunca vai para o cache negativo.
+    """
+
+    CONNECTION_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    ALIVE_HOST_ERRORS = (requests.exceptions.ConnectionError,)
+    # Falhas restritas a um endpoint (ex.: TLS numa porta HTTP) não contam para o host
+    ENDPOINT_ERRORS = (requests.exceptions.SSLError,)
+
+    def __init__(self, max_failures: int = 3, negative_cache: Optional[NegativeCache] = None, max_read_timeouts: int = 5):
+        self.max_failures = max_failures
+        self.max_read_timeouts = max_read_timeouts
+        self.negative_cache = negative_cache
+        self._failures: Dict[str, int] = {}
+        self._read_timeouts: Dict[str, int] = {}
+        self._seen_alive: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def is_open(self, ip: str) -> bool:
+        with self._lock:
+            return self._failures.get(ip, 0) >= self.max_failures
+
+    def is_alive(self, ip: str) -> bool:
+        """Retorna True se o host já devolveu uma resposta HTTP nesta varredura"""
+        with self._lock:
+            return ip in self._seen_alive
+
+    def record_failure(self, ip: str, error: Optional[Exception] = None):
+        with self._lock:
+            alive = ip in self._seen_alive
+            if alive and error is not None and not isinstance(error, self.ALIVE_HOST_ERRORS):
+                read_timeouts = self._read_timeouts.get(ip, 0) + 1
+                self._read_timeouts[ip] = read_timeouts
+                if read_timeouts < self.max_read_timeouts:
+                    return
+                failures = self._failures[ip] = self.max_failures
+            else:
+                failures = self._failures[ip] = self._failures.get(ip, 0) + 1
+        if failures == self.max_failures:
+            logger.info(f"Circuit breaker aberto para {ip} após {failures} falhas de conexão")
+            if self.negative_cache is not None and not alive:
+                self.negative_cache.add(ip)
+
+    def trip(self, ip: str):
+        """Abre o circuito imediatamente (ex.: nenhuma porta respondeu)"""
+        with self._lock:
+            self._failures[ip] = self.max_failures
+            alive = ip in self._seen_alive
+        if self.negative_cache is not None and not alive:
+            self.negative_cache.add(ip)
+
+    def record_success(self, ip: str):
+        with self._lock:
+            self._failures.pop(ip, None)
+            self._seen_alive.add(ip)
+        if self.negative_cache is not None:
+            self.negative_cache.remove(ip)
+
+    def request(self, method: str, ip: str, url: str, **kwargs) -> requests.Response:
+        """Executa requisição HTTP respeitando o estado do circuito do host"""
+        if self.is_open(ip):
+            raise HostUnavailableError(f"Host {ip} bloqueado pelo circuit breaker")
+
+        try:
+            response = requests.request(method, url, **kwargs)
+        except self.ENDPOINT_ERRORS:
+            raise
+        except self.CONNECTION_ERRORS as e:
+            self.record_failure(ip, e)
+            raise
+
+        self.record_success(ip)
+        return response
+
+    def admit(self, ip: str, probe: Callable[[], bool]) -> bool:
+        """Decide se o host deve ser varrido, consultando o cache negativo.
+
+        Hosts dentro do TTL são ignorados; hosts com TTL vencido passam pela
+        sonda barata `probe` (half-open) antes de liberar a varredura completa.
+        """
+        cache = self.negative_cache
+        if cache is None:
+            return True
+        if cache.is_dead(ip):
+            logger.debug(f"Host {ip} ignorado pelo cache negativo")
+            return False
+        if cache.is_expired(ip):
+            if probe():
+                cache.remove(ip)
+                return True
+            cache.add(ip)
+            return False
+        return True
+
+
+def probe_tcp(ip: str, port: int, timeout: float) -> bool:
+    """Sonda barata: uma única tentativa de conexão TCP"""
+    try:
+        with socket.create_connection((ip, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
@@ -1,9 +1,13 @@
 # universal_camera_detector/dahua_handler.py
 
-import requests
+import io
 from requests.auth import HTTPBasicAuth, HTTPDigestAuth
 import logging
-from typing import Dict, Optional, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from .circuit_breaker import HostCircuitBreaker
+from .snapshots import MAX_SNAPSHOT_BYTES, stream_image
+from .parsers import scan_kv
 
 logger = logging.getLogger(__name__)
 
@@ -19,16 +23,40 @@ class DahuaHandler:
         'network_config': '/cgi-bin/configManager.cgi?action=setConfig'
     }
 
+    SNAPSHOT_ENDPOINTS = [
+        '/cgi-bin/snapshot.cgi?channel={channel}',
+        '/cgi-bin/currentpic.cgi?channel={channel}'
+    ]
+
+    CHANNEL_ENDPOINTS = {
+        'local': ('/cgi-bin/devVideoInput.cgi?action=getCollect', 'result'),
+        'remote': ('/cgi-bin/magicBox.cgi?action=getProductDefinition&name=MaxRemoteInputChannels', 'table.MaxRemoteInputChannels')
+    }
+
+    DEVICE_INFO_KEYS = ('DeviceType', 'sn', 'SoftwareVersion')
+
+    NETWORK_KEYS = (
+        'table.Network.eth0.IPAddress',
+        'table.Network.eth0.SubnetMask',
+        'table.Network.eth0.DefaultGateway',
+        'table.Network.eth0.DhcpEnable'
+    )
+
+    def __init__(self, circuit_breaker: Optional[HostCircuitBreaker] = None):
+        self.circuit_breaker = circuit_breaker or HostCircuitBreaker()
+
     def detect_camera(self, ip: str, username: str, password: str, protocol: str, port: int, timeout: int) -> Tuple[bool, Dict]:
         """Detecta câmera Dahua usando múltiplos endpoints"""
         detection_endpoints = list(self.ENDPOINTS.values())
 
         for endpoint in detection_endpoints:
+            if self.circuit_breaker.is_open(ip):
+                break
             url = f"{protocol}://{ip}:{port}{endpoint}"
 
             # Testa Basic Auth primeiro
             try:
-                response = requests.get(url, auth=HTTPBasicAuth(username, password), timeout=timeout, verify=False)
+                response = self.circuit_breaker.request('get', ip, url, auth=HTTPBasicAuth(username, password), timeout=timeout, verify=False)
                 if response.status_code == 200 and "Dahua" in response.text.lower():
                     info = self._collect_dahua_info(ip, username, password, 'basic', protocol, port, timeout)
                     return True, {
@@ -43,7 +71,7 @@ class DahuaHandler:
 
             # Se falhar, tenta Digest Auth
             try:
-                response = requests.get(url, auth=HTTPDigestAuth(username, password), timeout=timeout, verify=False)
+                response = self.circuit_breaker.request('get', ip, url, auth=HTTPDigestAuth(username, password), timeout=timeout, verify=False)
                 if response.status_code == 200 and "Dahua" in response.text.lower():
                     info = self._collect_dahua_info(ip, username, password, 'digest', protocol, port, timeout)
                     return True, {
@@ -61,33 +89,24 @@ class DahuaHandler:
     def _collect_dahua_info(self, ip: str, username: str, password: str, auth_type: str, protocol: str, port: int, timeout: int) -> Dict:
         """Coleta informações detalhadas de uma câmera Dahua"""
         info = {}
-        for key, endpoint in self.ENDPOINTS.items():
-            try:
-                url = f"{protocol}://{ip}:{port}{endpoint}"
-                auth = HTTPBasicAuth(username, password) if auth_type == 'basic' else HTTPDigestAuth(username, password)
-                response = requests.get(url, auth=auth, timeout=timeout, verify=False)
-
-                if response.status_code == 200:
-                    parsed_info = self._parse_dahua_response(response.text)
-                    if key == 'device_info':
-                        info.update({
-                            'model': parsed_info.get('DeviceType', 'Desconhecido'),
-                            'serial': parsed_info.get('sn', 'Desconhecido'),
-                            'version': parsed_info.get('SoftwareVersion', 'Desconhecido')
-                        })
-            except Exception as e:
-                logger.debug(f"Erro ao coletar info via {key}: {e}")
-        
-        return info
+        if self.circuit_breaker.is_open(ip):
+            return info
+
+        try:
+            url = f"{protocol}://{ip}:{port}{self.ENDPOINTS['device_info']}"
+            auth = HTTPBasicAuth(username, password) if auth_type == 'basic' else HTTPDigestAuth(username, password)
+            response = self.circuit_breaker.request('get', ip, url, auth=auth, timeout=timeout, verify=False)
+
+            if response.status_code == 200:
+                parsed_info = scan_kv(response.text, self.DEVICE_INFO_KEYS)
+                info.update({
+                    'model': parsed_info.get('DeviceType', 'Desconhecido'),
+                    'serial': parsed_info.get('sn', 'Desconhecido'),
+                    'version': parsed_info.get('SoftwareVersion', 'Desconhecido')
+                })
+        except Exception as e:
+            logger.debug(f"Erro ao coletar info via device_info: {e}")
 
-    def _parse_dahua_response(self, response_text: str) -> Dict:
-        """Parse da resposta Dahua formato key=value"""
-        info = {}
-        lines = response_text.strip().split('\n')
-        for line in lines:
-            if '=' in line:
-                key, value = line.split('=', 1)
-                info[key.strip()] = value.strip()
         return info
 
     def get_network_info(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int) -> Dict:
@@ -97,9 +116,9 @@ class DahuaHandler:
         auth = auth_class(username, password)
 
         try:
-            response = requests.get(url, auth=auth, timeout=timeout, verify=False)
+            response = self.circuit_breaker.request('get', ip, url, auth=auth, timeout=timeout, verify=False)
             if response.status_code == 200:
-                config = self._parse_dahua_response(response.text)
+                config = scan_kv(response.text, self.NETWORK_KEYS)
                 return {
                     'ip_atual': config.get('table.Network.eth0.IPAddress', ip),
                     'mascara': config.get('table.Network.eth0.SubnetMask', '—'),
@@ -130,25 +149,54 @@ class DahuaHandler:
         headers = {'Content-Type': 'application/x-www-form-urlencoded'}
 
         try:
-            response = requests.post(url, auth=auth, data=config_string, headers=headers, timeout=timeout, verify=False)
+            response = self.circuit_breaker.request('post', ip, url, auth=auth, data=config_string, headers=headers, timeout=timeout, verify=False)
             return response.status_code == 200 and 'OK' in response.text
         except Exception as e:
             logger.error(f"Erro ao aplicar config Dahua {ip}: {e}")
             return False
 
-    def capture_snapshot(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int) -> Optional[bytes]:
-        """Captura snapshot da câmera Dahua"""
-        endpoints = ['/cgi-bin/snapshot.cgi', '/cgi-bin/currentpic.cgi']
+    def _get_channel_total(self, ip: str, auth, protocol: str, port: int, timeout: int, kind: str) -> int:
+        endpoint, key = self.CHANNEL_ENDPOINTS[kind]
+        if self.circuit_breaker.is_open(ip):
+            return 0
+        try:
+            url = f"{protocol}://{ip}:{port}{endpoint}"
+            response = self.circuit_breaker.request('get', ip, url, auth=auth, timeout=timeout, verify=False)
+            if response.status_code == 200:
+                value = scan_kv(response.text, (key,)).get(key, '')
+                if value.isdigit():
+                    return int(value)
+        except Exception as e:
+            logger.debug(f"Erro ao obter canais de {ip} via {endpoint}: {e}")
+        return 0
+
+    def get_channels(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int) -> List[int]:
+        """Obtém os IDs dos canais (analógicos seguidos dos remotos/IP); câmeras retornam [1]"""
         auth_class = HTTPBasicAuth if auth_info.get('auth_type') == 'basic' else HTTPDigestAuth
         auth = auth_class(username, password)
+        local = self._get_channel_total(ip, auth, protocol, port, timeout, 'local')
+        remote = self._get_channel_total(ip, auth, protocol, port, timeout, 'remote')
+        return list(range(1, local + remote + 1)) or [1]
 
-        for endpoint in endpoints:
-            try:
-                url = f"{protocol}://{ip}:{port}{endpoint}"
-                response = requests.get(url, auth=auth, timeout=timeout, verify=False)
-                if response.status_code == 200 and response.headers.get('content-type', '').startswith('image/'):
-                    return response.content
-            except Exception as e:
-                logger.debug(f"Erro ao capturar imagem de {ip}: {e}")
-                continue
+    def download_snapshot(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int, endpoint: str, fileobj: BinaryIO, max_bytes: int = MAX_SNAPSHOT_BYTES) -> bool:
+        """Baixa um snapshot em blocos para fileobj, respeitando max_bytes"""
+        auth_class = HTTPBasicAuth if auth_info.get('auth_type') == 'basic' else HTTPDigestAuth
+        auth = auth_class(username, password)
+        url = f"{protocol}://{ip}:{port}{endpoint}"
+
+        try:
+            response = self.circuit_breaker.request('get', ip, url, auth=auth, timeout=timeout, verify=False, stream=True)
+            return stream_image(response, fileobj, max_bytes)
+        except Exception as e:
+            logger.debug(f"Erro ao capturar imagem de {ip}: {e}")
+            return False
+
+    def capture_snapshot(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int, channel: int = 1, max_bytes: int = MAX_SNAPSHOT_BYTES) -> Optional[bytes]:
+        """Captura snapshot da câmera Dahua"""
+        for endpoint in self.SNAPSHOT_ENDPOINTS:
+            if self.circuit_breaker.is_open(ip):
+                break
+            buffer = io.BytesIO()
+            if self.download_snapshot(ip, username, password, auth_info, protocol, port, timeout, endpoint.format(channel=channel), buffer, max_bytes):
+                return buffer.getvalue()
         return None
@@ -3,12 +3,17 @@
 import concurrent.futures
 import logging
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Tuple
+from typing import BinaryIO, List, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 from .hikvision_handler import HikvisionHandler
 from .dahua_handler import DahuaHandler
+from .circuit_breaker import HostCircuitBreaker, NegativeCache, probe_tcp
+from .inventory import EndpointInventory
+from .snapshots import MAX_SNAPSHOT_BYTES
+
+HTTP_PROTOCOLS = ('http', 'https')
 
 
 class CameraHandler(ABC):
@@ -27,23 +32,41 @@ class CameraHandler(ABC):
         pass
 
     @abstractmethod
-    def capture_snapshot(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int) -> Optional[bytes]:
+    def get_channels(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int) -> List[int]:
+        pass
+
+    @abstractmethod
+    def download_snapshot(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int, endpoint: str, fileobj: BinaryIO, max_bytes: int) -> bool:
+        pass
+
+    @abstractmethod
+    def capture_snapshot(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int, channel: int = 1, max_bytes: int = MAX_SNAPSHOT_BYTES) -> Optional[bytes]:
         pass
 
 
 class UniversalCameraDetector:
     """Detector universal de câmeras com captura de thumbnails"""
     
-    def __init__(self):
+    def __init__(self, max_failures: int = 3, negative_cache: Optional[NegativeCache] = None):
+        self.circuit_breaker = HostCircuitBreaker(max_failures, negative_cache)
         self.handlers = {
-            'hikvision': HikvisionHandler(),
-            'dahua': DahuaHandler()
+            'hikvision': HikvisionHandler(self.circuit_breaker),
+            'dahua': DahuaHandler(self.circuit_breaker)
         }
 
     def detect_camera_brand(self, ip: str, username_list: List[str], password_list: List[str], protocol: str, port: int, timeout: int) -> Optional[Dict]:
         """Detecta automaticamente a marca da câmera"""
+        if not self.circuit_breaker.admit(ip, lambda: probe_tcp(ip, port, timeout)):
+            return None
+        return self._detect_on_endpoint(ip, username_list, password_list, protocol, port, timeout)
+
+    def _detect_on_endpoint(self, ip: str, username_list: List[str], password_list: List[str], protocol: str, port: int, timeout: int) -> Optional[Dict]:
         for username in username_list:
             for password in password_list:
+                if self.circuit_breaker.is_open(ip):
+                    logger.debug(f"Abortando detecção de {ip}: host indisponível")
+                    return None
+
                 # Tenta Dahua primeiro
                 success, info = self.handlers['dahua'].detect_camera(ip, username, password, protocol, port, timeout)
                 if success:
@@ -58,6 +81,58 @@ class UniversalCameraDetector:
 
         return None
 
+    def probe_ports(self, ip: str, candidates: List[Tuple[str, int]], timeout: int) -> List[Tuple[str, int]]:
+        """Testa as portas candidatas em paralelo (uma conexão TCP por porta)"""
+        if not candidates:
+            return []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+            results = list(executor.map(lambda candidate: probe_tcp(ip, candidate[1], timeout), candidates))
+        return [candidate for candidate, is_open in zip(candidates, results) if is_open]
+
+    def detect_camera_multiport(self, ip: str, username_list: List[str], password_list: List[str], candidates: List[Tuple[str, int]], timeout: int, inventory: Optional[EndpointInventory] = None) -> Optional[Dict]:
+        """Detecta a câmera testando vários pares protocolo/porta numa única passada"""
+        candidates = list(candidates)
+        if not candidates:
+            logger.error(f"Nenhuma porta candidata para {ip}")
+            return None
+
+        remembered = inventory.get(ip) if inventory is not None else None
+        if remembered is not None:
+            if remembered in candidates:
+                candidates.remove(remembered)
+            candidates.insert(0, remembered)
+
+        # A própria sondagem das portas serve de sonda half-open do cache negativo
+        probed = []
+
+        def probe() -> bool:
+            probed.append(self.probe_ports(ip, candidates, timeout))
+            return bool(probed[-1])
+
+        if not self.circuit_breaker.admit(ip, probe):
+            return None
+
+        open_endpoints = probed[-1] if probed else self.probe_ports(ip, candidates, timeout)
+        if not open_endpoints:
+            self.circuit_breaker.trip(ip)
+            return None
+
+        for protocol, port in open_endpoints:
+            if protocol not in HTTP_PROTOCOLS:
+                continue
+            info = self._detect_on_endpoint(ip, username_list, password_list, protocol, port, timeout)
+            if info:
+                info.update({
+                    'protocol': protocol,
+                    'port': port,
+                    'open_ports': [f"{p}:{n}" for p, n in open_endpoints]
+                })
+                if inventory is not None:
+                    inventory.remember(ip, protocol, port, brand=info.get('brand'))
+                return info
+
+        return None
+
     def get_network_info(self, camera_info: Dict, ip: str, protocol: str, port: int, timeout: int) -> Dict:
         brand = camera_info['brand'].lower()
         if brand in self.handlers:
@@ -67,12 +142,12 @@ class UniversalCameraDetector:
             )
         return {'ip_atual': ip, 'mascara': '—', 'gateway': '—', 'dhcp': '—'}
 
-    def capture_snapshot(self, camera_info: Dict, ip: str, protocol: str, port: int, timeout: int) -> Optional[bytes]:
+    def capture_snapshot(self, camera_info: Dict, ip: str, protocol: str, port: int, timeout: int, channel: int = 1, max_bytes: int = MAX_SNAPSHOT_BYTES) -> Optional[bytes]:
         brand = camera_info['brand'].lower()
         if brand in self.handlers:
             return self.handlers[brand].capture_snapshot(
                 ip, camera_info['username'], camera_info['password'], 
-                camera_info, protocol, port, timeout
+                camera_info, protocol, port, timeout, channel, max_bytes
             )
         return None
 
@@ -1,10 +1,13 @@
 # universal_camera_detector/hikvision_handler.py
 
-import requests
+import io
 from requests.auth import HTTPDigestAuth
-import xml.etree.ElementTree as ET
 import logging
-from typing import Dict, Optional
+from typing import BinaryIO, Dict, List, Optional
+
+from .circuit_breaker import HostCircuitBreaker
+from .snapshots import MAX_SNAPSHOT_BYTES, stream_image
+from .parsers import XmlSelector, namespace_of, parse_xml
 
 logger = logging.getLogger(__name__)
 
@@ -17,27 +20,48 @@ class HikvisionHandler:
         'isapi_v20': {'ns': 'http://www.isapi.org/ver20/XMLSchema'}
     }
 
+    SELECTORS = {
+        'model': XmlSelector('.//model'),
+        'serial': XmlSelector('.//serialNumber'),
+        'ip_address': XmlSelector('.//ipAddress'),
+        'subnet_mask': XmlSelector('.//subnetMask'),
+        'gateway': XmlSelector('.//DefaultGateway/ipAddress')
+    }
+
+    SNAPSHOT_ENDPOINTS = [
+        '/ISAPI/Streaming/channels/{channel}01/picture',
+        '/ISAPI/Streaming/channels/{channel}/picture',
+        '/cgi-bin/snapshot.cgi?channel={channel}'
+    ]
+
+    CHANNEL_ENDPOINTS = {
+        'local': ('/ISAPI/System/Video/inputs/channels', XmlSelector('./VideoInputChannel/id')),
+        'remote': ('/ISAPI/ContentMgmt/InputProxy/channels', XmlSelector('./InputProxyChannel/id'))
+    }
+
+    def __init__(self, circuit_breaker: Optional[HostCircuitBreaker] = None):
+        self.circuit_breaker = circuit_breaker or HostCircuitBreaker()
+
     def detect_camera(self, ip: str, username: str, password: str, protocol: str, port: int, timeout: int) -> (bool, Dict):
         """Detecta câmera Hikvision"""
         url = f"{protocol}://{ip}:{port}/ISAPI/System/deviceInfo"
         auth = HTTPDigestAuth(username, password)
 
         try:
-            response = requests.get(url, auth=auth, timeout=timeout, verify=False)
+            response = self.circuit_breaker.request('get', ip, url, auth=auth, timeout=timeout, verify=False)
             if response.status_code == 200:
                 try:
-                    xml = ET.fromstring(response.content)
-                    for ns_name, namespace in self.NAMESPACES.items():
-                        model_elem = xml.find('.//model', namespaces=namespace)
-                        serial_elem = xml.find('.//serialNumber', namespaces=namespace)
-                        if model_elem is not None:
-                            return True, {
-                                'brand': 'Hikvision',
-                                'model': model_elem.text or 'Desconhecido',
-                                'serial': serial_elem.text or 'Desconhecido',
-                                'namespace': namespace,
-                                'auth_type': 'digest'
-                            }
+                    xml = parse_xml(response.content)
+                    uri = namespace_of(xml)
+                    model = self.SELECTORS['model'].select(xml, uri)
+                    if model is not None:
+                        return True, {
+                            'brand': 'Hikvision',
+                            'model': model or 'Desconhecido',
+                            'serial': self.SELECTORS['serial'].select(xml, uri) or 'Desconhecido',
+                            'namespace': {'ns': uri} if uri else self.NAMESPACES['hikvision_v20'],
+                            'auth_type': 'digest'
+                        }
                     return True, {
                         'brand': 'Hikvision',
                         'model': 'Modelo Desconhecido',
@@ -58,19 +82,15 @@ class HikvisionHandler:
         auth = HTTPDigestAuth(username, password)
 
         try:
-            response = requests.get(url, auth=auth, timeout=timeout, verify=False)
+            response = self.circuit_breaker.request('get', ip, url, auth=auth, timeout=timeout, verify=False)
             if response.status_code == 200:
-                xml = ET.fromstring(response.content)
-                namespace = auth_info.get('namespace', self.NAMESPACES['hikvision_v20'])
-
-                ip_atual = xml.find('.//ipAddress', namespaces=namespace)
-                mascara = xml.find('.//subnetMask', namespaces=namespace)
-                gateway_elem = xml.find('.//DefaultGateway/ipAddress', namespaces=namespace)
+                xml = parse_xml(response.content)
+                uri = namespace_of(xml)
 
                 return {
-                    'ip_atual': ip_atual.text if ip_atual is not None else ip,
-                    'mascara': mascara.text if mascara is not None else '—',
-                    'gateway': gateway_elem.text if gateway_elem is not None else '—',
+                    'ip_atual': self.SELECTORS['ip_address'].select(xml, uri) or ip,
+                    'mascara': self.SELECTORS['subnet_mask'].select(xml, uri) or '—',
+                    'gateway': self.SELECTORS['gateway'].select(xml, uri) or '—',
                     'dhcp': '—'
                 }
         except Exception as e:
@@ -101,23 +121,55 @@ class HikvisionHandler:
 </IPAddress>"""
 
         try:
-            response = requests.put(url, auth=auth, data=xml_data, headers=headers, timeout=timeout, verify=False)
+            response = self.circuit_breaker.request('put', ip, url, auth=auth, data=xml_data, headers=headers, timeout=timeout, verify=False)
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Erro ao configurar {ip}: {e}")
             return False
 
-    def capture_snapshot(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int) -> Optional[bytes]:
-        """Captura snapshot da câmera Hikvision"""
-        endpoints = ['/ISAPI/Streaming/channels/1/picture', '/cgi-bin/snapshot.cgi']
+    def _get_channel_ids(self, ip: str, auth, protocol: str, port: int, timeout: int, kind: str) -> List[int]:
+        endpoint, selector = self.CHANNEL_ENDPOINTS[kind]
+        if self.circuit_breaker.is_open(ip):
+            return []
+        try:
+            url = f"{protocol}://{ip}:{port}{endpoint}"
+            response = self.circuit_breaker.request('get', ip, url, auth=auth, timeout=timeout, verify=False)
+            if response.status_code == 200:
+                return [int(value) for value in selector.select_all(parse_xml(response.content)) if value.strip().isdigit()]
+        except Exception as e:
+            logger.debug(f"Erro ao obter canais de {ip} via {endpoint}: {e}")
+        return []
+
+    def get_channels(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int) -> List[int]:
+        """Obtém os IDs dos canais analógicos e IP (DVR/NVR/híbridos); câmeras retornam [1]"""
+        auth = HTTPDigestAuth(username, password)
+        local = self._get_channel_ids(ip, auth, protocol, port, timeout, 'local')
+        remote = self._get_channel_ids(ip, auth, protocol, port, timeout, 'remote')
+
+        # Em DVRs híbridos os canais IP são numerados depois dos analógicos
+        if local and set(local) & set(remote):
+            remote = [channel + max(local) for channel in remote]
+
+        return sorted(set(local) | set(remote)) or [1]
+
+    def download_snapshot(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int, endpoint: str, fileobj: BinaryIO, max_bytes: int = MAX_SNAPSHOT_BYTES) -> bool:
+        """Baixa um snapshot em blocos para fileobj, respeitando max_bytes"""
         auth = HTTPDigestAuth(username, password)
+        url = f"{protocol}://{ip}:{port}{endpoint}"
 
-        for endpoint in endpoints:
-            try:
-                url = f"{protocol}://{ip}:{port}{endpoint}"
-                response = requests.get(url, auth=auth, timeout=timeout, verify=False)
-                if response.status_code == 200 and response.headers.get('content-type', '').startswith('image/'):
-                    return response.content
-            except Exception as e:
-                logger.debug(f"Erro no endpoint {endpoint} para {ip}: {e}")
+        try:
+            response = self.circuit_breaker.request('get', ip, url, auth=auth, timeout=timeout, verify=False, stream=True)
+            return stream_image(response, fileobj, max_bytes)
+        except Exception as e:
+            logger.debug(f"Erro no endpoint {endpoint} para {ip}: {e}")
+            return False
+
+    def capture_snapshot(self, ip: str, username: str, password: str, auth_info: Dict, protocol: str, port: int, timeout: int, channel: int = 1, max_bytes: int = MAX_SNAPSHOT_BYTES) -> Optional[bytes]:
+        """Captura snapshot da câmera Hikvision"""
+        for endpoint in self.SNAPSHOT_ENDPOINTS:
+            if self.circuit_breaker.is_open(ip):
+                break
+            buffer = io.BytesIO()
+            if self.download_snapshot(ip, username, password, auth_info, protocol, port, timeout, endpoint.format(channel=channel), buffer, max_bytes):
+                return buffer.getvalue()
         return None
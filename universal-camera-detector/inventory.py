@@ -0,0 +1,55 @@
+# universal_camera_detector/inventory.py
+
+import json
+import os
+import threading
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointInventory:
+    """Inventário persistente do endpoint (protocolo/porta) que funcionou em cada IP"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._endpoints: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                self._endpoints = {ip: entry for ip, entry in data.items() if 'protocol' in entry and 'port' in entry}
+        except (OSError, ValueError) as e:
+            logger.error(f"Erro ao carregar inventário {self.path}: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = dict(self._endpoints)
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            logger.error(f"Erro ao salvar inventário {self.path}: {e}")
+
+    def get(self, ip: str) -> Optional[Tuple[str, int]]:
+        with self._lock:
+            entry = self._endpoints.get(ip)
+        if entry is None:
+            return None
+        return entry['protocol'], int(entry['port'])
+
+    def remember(self, ip: str, protocol: str, port: int, **extra):
+        with self._lock:
+            self._endpoints[ip] = {'protocol': protocol, 'port': port, **extra}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._endpoints)
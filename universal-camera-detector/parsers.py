@@ -0,0 +1,124 @@
+# universal_camera_detector/parsers.py
+
+import threading
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+HAS_LXML = lxml_etree is not None
+
+KNOWN_NAMESPACES = (
+    'http://www.hikvision.com/ver20/XMLSchema',
+    'http://www.hikvision.com/ver10/XMLSchema',
+    'http://www.isapi.org/ver20/XMLSchema'
+)
+
+_parser_local = threading.local()
+
+
+def _lxml_parser():
+    """XMLParser do lxml não é thread-safe: um por thread"""
+    parser = getattr(_parser_local, 'parser', None)
+    if parser is None:
+        parser = lxml_etree.XMLParser(resolve_entities=False, no_network=True, remove_comments=True)
+        _parser_local.parser = parser
+    return parser
+
+
+def parse_xml(content: bytes):
+    """Faz o parse do XML usando lxml quando disponível, senão ElementTree"""
+    if HAS_LXML:
+        return lxml_etree.fromstring(content, parser=_lxml_parser())
+    return ET.fromstring(content)
+
+
+def namespace_of(root) -> Optional[str]:
+    """Retorna o namespace do elemento raiz ('{uri}Tag' -> 'uri')"""
+    tag = root.tag
+    if isinstance(tag, str) and tag.startswith('{'):
+        return tag[1:tag.index('}')]
+    return None
+
+
+class XmlSelector:
+    """Seletor de elementos com caminhos pré-compilados por namespace.
+
+    O caminho é escrito sem prefixo (ex.: './/DefaultGateway/ipAddress') e é
+    compilado uma vez para cada namespace: XPath do lxml ou caminho expandido
+    '{uri}tag' do ElementTree.
+    """
+
+    def __init__(self, path: str, namespaces: Iterable[str] = KNOWN_NAMESPACES):
+        self.path = path
+        self.use_lxml = HAS_LXML
+        self._compiled = {}
+        self._lock = threading.Lock()
+        for uri in (None, *namespaces):
+            self._compile(uri)
+
+    def _compile(self, uri: Optional[str]):
+        steps = self.path.split('/')
+        if self.use_lxml:
+            prefixed = '/'.join(f"ns:{step}" if uri and step not in ('', '.') else step for step in steps)
+            selector = lxml_etree.XPath(prefixed, namespaces={'ns': uri} if uri else None)
+        else:
+            selector = '/'.join(f"{{{uri}}}{step}" if uri and step not in ('', '.') else step for step in steps)
+        with self._lock:
+            self._compiled[uri] = selector
+        return selector
+
+    def _selector(self, root, namespace: Optional[str]):
+        if namespace is None:
+            namespace = namespace_of(root)
+        selector = self._compiled.get(namespace)
+        if selector is None:
+            selector = self._compile(namespace)
+        return selector
+
+    def find_all(self, root, namespace: Optional[str] = None) -> List:
+        """Todos os elementos que casam com o caminho"""
+        selector = self._selector(root, namespace)
+        return selector(root) if self.use_lxml else root.findall(selector)
+
+    def select(self, root, namespace: Optional[str] = None) -> Optional[str]:
+        """Retorna o texto do primeiro elemento encontrado (ou None)"""
+        selector = self._selector(root, namespace)
+        if self.use_lxml:
+            result = selector(root)
+            elem = result[0] if result else None
+        else:
+            elem = root.find(selector)
+        return elem.text if elem is not None else None
+
+    def select_all(self, root, namespace: Optional[str] = None) -> List[str]:
+        """Textos de todos os elementos encontrados, na ordem do documento"""
+        return [elem.text for elem in self.find_all(root, namespace) if elem.text is not None]
+
+    def count(self, root, namespace: Optional[str] = None) -> int:
+        """Quantidade de elementos que casam com o caminho"""
+        return len(self.find_all(root, namespace))
+
+
+def scan_kv(text: str, keys: Iterable[str]) -> Dict[str, str]:
+    """Varre respostas Dahua key=value e para assim que as chaves pedidas forem encontradas"""
+    wanted = set(keys)
+    found = {}
+    pos = 0
+    length = len(text)
+
+    while pos < length and len(found) < len(wanted):
+        end = text.find('\n', pos)
+        if end == -1:
+            end = length
+        eq = text.find('=', pos, end)
+        if eq != -1:
+            key = text[pos:eq].strip()
+            if key in wanted and key not in found:
+                found[key] = text[eq + 1:end].strip()
+        pos = end + 1
+
+    return found
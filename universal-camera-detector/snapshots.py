@@ -0,0 +1,138 @@
+# universal_camera_detector/snapshots.py
+
+import concurrent.futures
+import os
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple, BinaryIO
+
+logger = logging.getLogger(__name__)
+
+MAX_SNAPSHOT_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+def stream_image(response, fileobj: BinaryIO, max_bytes: int = MAX_SNAPSHOT_BYTES, chunk_size: int = CHUNK_SIZE) -> bool:
+    """Grava o corpo de uma resposta de imagem em blocos, respeitando o limite de bytes"""
+    try:
+        if response.status_code != 200 or not response.headers.get('content-type', '').startswith('image/'):
+            return False
+
+        content_length = response.headers.get('content-length')
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            logger.debug(f"Snapshot de {content_length} bytes excede o limite de {max_bytes}")
+            return False
+
+        total = 0
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            total += len(chunk)
+            if total > max_bytes:
+                logger.debug(f"Snapshot interrompido: excede o limite de {max_bytes} bytes")
+                return False
+            fileobj.write(chunk)
+        return total > 0
+    finally:
+        response.close()
+
+
+class SnapshotEngine:
+    """Captura em massa de snapshots (todos os canais) gravando direto em disco"""
+
+    def __init__(self, detector, output_dir: str, max_bytes: int = MAX_SNAPSHOT_BYTES, per_device_workers: int = 4, max_workers: int = 8, endpoint_memory: Optional[Dict[Tuple[str, str], str]] = None):
+        self.detector = detector
+        self.output_dir = output_dir
+        self.max_bytes = max_bytes
+        self.per_device_workers = per_device_workers
+        self.max_workers = max_workers
+        self.endpoint_memory = endpoint_memory if endpoint_memory is not None else {}
+        self._lock = threading.Lock()
+
+    def _ordered_endpoints(self, handler, camera_info: Dict) -> List[str]:
+        """Coloca primeiro o endpoint que já funcionou para o mesmo modelo"""
+        key = (camera_info.get('brand', ''), camera_info.get('model', ''))
+        endpoints = list(handler.SNAPSHOT_ENDPOINTS)
+        with self._lock:
+            known = self.endpoint_memory.get(key)
+        if known in endpoints:
+            endpoints.remove(known)
+            endpoints.insert(0, known)
+        return endpoints
+
+    def _remember_endpoint(self, camera_info: Dict, endpoint: str):
+        key = (camera_info.get('brand', ''), camera_info.get('model', ''))
+        with self._lock:
+            self.endpoint_memory[key] = endpoint
+
+    def capture_channel(self, camera_info: Dict, ip: str, channel: int, timeout: int) -> Optional[str]:
+        """Captura um canal e retorna o caminho do arquivo gravado"""
+        brand = camera_info['brand'].lower()
+        handler = self.detector.handlers.get(brand)
+        if handler is None:
+            return None
+
+        protocol = camera_info.get('protocol', 'http')
+        port = camera_info.get('port', 80)
+        path = os.path.join(self.output_dir, f"{ip.replace(':', '_')}_ch{channel}.jpg")
+        tmp_path = f"{path}.part"
+
+        for endpoint in self._ordered_endpoints(handler, camera_info):
+            try:
+                with open(tmp_path, 'wb') as f:
+                    saved = handler.download_snapshot(
+                        ip, camera_info['username'], camera_info['password'], camera_info,
+                        protocol, port, timeout, endpoint.format(channel=channel), f, self.max_bytes
+                    )
+                if saved:
+                    os.replace(tmp_path, path)
+                    self._remember_endpoint(camera_info, endpoint)
+                    return path
+            except OSError as e:
+                logger.error(f"Erro ao gravar snapshot de {ip} canal {channel}: {e}")
+                break
+
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        return None
+
+    def capture_device(self, camera_info: Dict, ip: str, timeout: int) -> Dict[int, str]:
+        """Captura todos os canais de um dispositivo (NVR/XVR) em paralelo"""
+        brand = camera_info['brand'].lower()
+        handler = self.detector.handlers.get(brand)
+        if handler is None:
+            return {}
+
+        channels = handler.get_channels(
+            ip, camera_info['username'], camera_info['password'], camera_info,
+            camera_info.get('protocol', 'http'), camera_info.get('port', 80), timeout
+        )
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        snapshots = {}
+        workers = max(1, min(self.per_device_workers, len(channels)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            future_to_channel = {
+                executor.submit(self.capture_channel, camera_info, ip, channel, timeout): channel
+                for channel in channels
+            }
+            for future in concurrent.futures.as_completed(future_to_channel):
+                path = future.result()
+                if path:
+                    snapshots[future_to_channel[future]] = path
+        return snapshots
+
+    def capture_all(self, cameras: List[Tuple[str, Dict]], timeout: int) -> Dict[str, Dict[int, str]]:
+        """Captura snapshots de vários dispositivos; retorna {ip: {canal: arquivo}}"""
+        results = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_ip = {
+                executor.submit(self.capture_device, camera_info, ip, timeout): ip
+                for ip, camera_info in cameras
+            }
+            for future in concurrent.futures.as_completed(future_to_ip):
+                ip = future_to_ip[future]
+                try:
+                    results[ip] = future.result()
+                except Exception as e:
+                    logger.error(f"Erro na captura em massa de {ip}: {e}")
+                    results[ip] = {}
+        return results
@@ -1,7 +1,7 @@
 # universal_camera_detector/utils.py
 
 import ipaddress
-from typing import List
+from typing import List, Tuple
 
 def is_valid_ip(ip_str: str) -> bool:
     """Valida se uma string é um IP válido"""
@@ -26,3 +26,26 @@ def parse_ip_file(txt_content: str) -> List[str]:
         else:
             print(f"Linha {line_num}: IP inválido ignorado - {ip}")
     return ip_list
+
+DEFAULT_PORT_PROTOCOLS = {443: 'https', 554: 'rtsp'}
+
+def parse_port_candidates(spec: str) -> List[Tuple[str, int]]:
+    """Lê candidatos protocolo:porta (ex.: "http:80,https:443,8000,rtsp:554")"""
+    candidates = []
+    for item in spec.split(','):
+        item = item.strip().lower()
+        if not item:
+            continue
+        protocol, _, port_str = item.rpartition(':')
+        try:
+            port = int(port_str)
+        except ValueError:
+            print(f"Candidato de porta inválido ignorado - {item}")
+            continue
+        if not 1 <= port <= 65535:
+            print(f"Candidato de porta inválido ignorado - {item}")
+            continue
+        protocol = protocol or DEFAULT_PORT_PROTOCOLS.get(port, 'http')
+        if (protocol, port) not in candidates:
+            candidates.append((protocol, port))
+    return candidates